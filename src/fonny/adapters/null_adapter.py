@@ -1,5 +1,3 @@
-from typing import Optional
-
 from fonny.ports.communication_port import CommunicationPort
 
 
@@ -34,15 +32,6 @@ class NullCommunicationAdapter(CommunicationPort):
         """
         raise NotImplementedError("No communication adapter has been set")
     
-    def receive_response(self) -> Optional[str]:
-        """
-        Raise NotImplementedError.
-        
-        Returns:
-            The response received or None if no response is available
-        """
-        raise NotImplementedError("No communication adapter has been set")
-    
     def is_connected(self) -> bool:
         """
         Raise NotImplementedError.
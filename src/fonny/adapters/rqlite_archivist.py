@@ -1,68 +1,332 @@
+import atexit
 import json
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from queue import Queue, SimpleQueue, Empty
 import pyrqlite.dbapi2 as rqlite
-from typing import Dict, Any, List
-from datetime import datetime
+from typing import Dict, Any, Iterable, Iterator, List, Tuple
+from datetime import datetime, timedelta
 
 from fonny.ports.archivist_port import ArchivistPort, EventType
 
+# orjson is much faster than the json module; it is optional, so fall back if it is missing
+try:
+    import orjson
+
+    def dumps(data: Dict[str, Any]) -> str:
+        return orjson.dumps(data).decode('utf-8')
+
+    loads = orjson.loads
+except ImportError:
+    dumps = json.dumps
+    loads = json.loads
+
+# pyrqlite substitutes parameters into the SQL text on the client, so nothing is bound in SQLite;
+# the cap bounds the size of each statement and of the HTTP request that carries it
+MAX_ROWS_PER_INSERT = 300
+
+# Unpacks a JSON array of {"t": event_type, "ts": timestamp, "d": data} objects in a single statement
+BULK_INSERT_SQL = (
+    "INSERT INTO events (event_type, timestamp, data) "
+    "SELECT json_extract(value, '$.t'), json_extract(value, '$.ts'), json_extract(value, '$.d') "
+    "FROM json_each(?) ORDER BY key"
+)
+
+CREATE_EVENTS_TABLE_SQL = '''
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    event_type TEXT NOT NULL,
+    timestamp INTEGER NOT NULL,
+    data TEXT NOT NULL
+)
+'''
+# Lets SELECT_EVENTS_BY_TYPE_SQL seek to one type and read it in id order without sorting
+CREATE_EVENTS_INDEX_SQL = 'CREATE INDEX IF NOT EXISTS idx_events_type_id ON events (event_type, id)'
+
+# Timestamps are stored as integer microseconds since EPOCH and only formatted when read.
+# They are naive wall-clock times, as ArchivistPort records them, so no time zone is involved.
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+
+# Both take the id to read after, so callers can fetch only events newer than those they have
+SELECT_EVENTS_SQL = "SELECT id, event_type, timestamp, data FROM events WHERE id > ? ORDER BY id"
+SELECT_EVENTS_BY_TYPE_SQL = (
+    "SELECT id, event_type, timestamp, data FROM events WHERE event_type = ? AND id > ? ORDER BY id"
+)
+COUNT_EVENTS_SQL = "SELECT COUNT(*) FROM events"
+COUNT_EVENTS_BY_TYPE_SQL = "SELECT COUNT(*) FROM events WHERE event_type = ?"
+
+# A failed batch write is retried this many times in all, the delay doubling after each failure
+WRITE_ATTEMPTS = 4
+WRITE_RETRY_DELAY = 0.1
+
+# How long (in seconds) to wait for a pooled connection before giving up
+POOL_TIMEOUT = 30
+
+# Queued by close() to stop the writer thread
+_STOP = object()
+
+# (second, UTC offset in seconds) for the last second now_microseconds was called in
+_utc_offset = (None, 0)
+
+
+@lru_cache(maxsize=None)
+def insert_sql(row_count: int) -> str:
+    """
+    Build the multi-row INSERT for row_count events.
+    The text is cached, so each batch size is only built once.
+    """
+    return 'INSERT INTO events (event_type, timestamp, data) VALUES ' + ', '.join(['(?, ?, ?)'] * row_count)
+
+
+def to_microseconds(timestamp: datetime) -> int:
+    """
+    Turn a timestamp into the integer that is stored.
+    Aware timestamps are converted to naive local time first, the form datetime.now() gives.
+    """
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone().replace(tzinfo=None)
+    return (timestamp - EPOCH) // MICROSECOND
+
+
+def now_microseconds() -> int:
+    """
+    Local wall-clock time as stored: the value of to_microseconds(datetime.now()).
+    The UTC offset is only looked up again when the second changes; offsets only change on whole seconds.
+    """
+    global _utc_offset
+    second, microsecond = divmod(time.time_ns() // 1000, 1000000)
+    offset_second, offset = _utc_offset
+    if second != offset_second:
+        offset = time.localtime(second).tm_gmtoff
+        # Replaced as one tuple, since events are recorded from more than one thread
+        _utc_offset = (second, offset)
+    return (second + offset) * 1000000 + microsecond
+
+
+def format_timestamp(value) -> str:
+    """Turn a stored timestamp back into the ISO-8601 text that get_events returns."""
+    if isinstance(value, str):
+        if not value.isdigit():
+            return value  # Stored as ISO-8601 text by an older version
+        value = int(value)  # Integer stored in a column created with TEXT affinity
+    return (EPOCH + value * MICROSECOND).isoformat()
+
 
 class RQLiteArchivist(ArchivistPort):
     """
     SQLite implementation of the ArchivistPort interface.
     Stores events in an SQLite database.
+
+    Events are queued by record_event and written by a background writer
+    thread, which drains the queue in batches of up to batch_size events
+    using multi-row INSERTs. The writer and readers take connections from
+    a pool of pool_size connections, so reads do not wait for writes.
+
+    SQLite settings such as journal mode, synchronous and cache size are
+    not set here: rqlite runs PRAGMAs sent over HTTP on its read-only
+    connection, so they belong in rqlited's own configuration.
     """
-    
-    def __init__(self, host: str = 'localhost', port: int=4003):
+    __slots__ = ('_pool', '_batch_size', '_queue', '_write_thread', '_write_error', '_closed')
+
+    def __init__(self, host: str = 'localhost', port: int=4003, batch_size: int = 500, pool_size: int = 2):
+        if pool_size < 1:
+            raise ValueError(f"pool_size must be at least 1, not {pool_size}")
+        self._closed = False
+
+        # Each pooled connection keeps one cursor for its lifetime; pyrqlite cursors
+        # can be reused, and Connection.execute would allocate a new one per call
+        self._pool: Queue = Queue()
+        for _ in range(pool_size):
+            self._pool.put(rqlite.connect(host=host, port=port).cursor())
 
-        self._connection = rqlite.connect(host=host, port=port)
-        # This enables column access by name
-        self._cursor = self._connection.cursor()
+        # Create the events table and its index if they don't exist. Checking first is a read,
+        # which is cheaper on rqlite than a DDL write that has to go through the Raft log.
+        with self._cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE name IN ('events', 'idx_events_type_id')")
+            existing = {row[0] for row in cursor.fetchall()}
+            if 'events' not in existing:
+                cursor.execute(CREATE_EVENTS_TABLE_SQL)
+            if 'idx_events_type_id' not in existing:
+                # No ANALYZE here: statistics taken from a new, nearly empty table would tell
+                # the planner a scan is cheaper, and it would keep believing that as the table grows.
+                cursor.execute(CREATE_EVENTS_INDEX_SQL)
+            cursor.connection.commit()
 
-        # Create events table if it doesn't exist
-        self._cursor.execute('''
-        CREATE TABLE IF NOT EXISTS events (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            event_type TEXT NOT NULL,
-            timestamp TEXT NOT NULL,
-            data TEXT NOT NULL
-        )
-        ''')
+        self._batch_size = batch_size
+        # The error from a batch that could not be written, raised by the next flush or close
+        self._write_error = None
+        # Holds event rows, plus flush markers and the stop sentinel
+        self._queue: SimpleQueue = SimpleQueue()
+        self._write_thread = threading.Thread(target=self._write_events)
+        self._write_thread.daemon = True
+        self._write_thread.start()
+        # The writer is a daemon thread, so write out anything still queued at exit
+        atexit.register(self.flush)
 
-        self._connection.commit()
+    @contextmanager
+    def _cursor(self) -> Iterator[Any]:
+        """Borrow a pooled connection's cursor for the duration of the block."""
+        try:
+            cursor = self._pool.get(timeout=POOL_TIMEOUT)
+        except Empty:
+            raise TimeoutError(f"No rqlite connection became free within {POOL_TIMEOUT} seconds") from None
+        try:
+            yield cursor
+        finally:
+            # Drops the fetched rows; the cursor itself stays usable
+            cursor.close()
+            self._pool.put(cursor)
+
+    def _check_open(self) -> None:
+        if self._closed:
+            raise RuntimeError("RQLiteArchivist is closed")
 
     def record_event(self, event_type: EventType, data: Dict[str, Any], timestamp: datetime) -> None:
-        timestamp_str = timestamp.isoformat()
-        data_json = json.dumps(data)
-        self._cursor.execute(
-            'INSERT INTO events (event_type, timestamp, data) VALUES (?, ?, ?)',
-            (event_type.name, timestamp_str, data_json)
-        )
-        self._connection.commit()
-
-    def get_events(self, event_type=None) -> List[dict]:
-        if event_type:
-            self._cursor.execute(
-                "SELECT id, event_type, timestamp, data FROM events WHERE event_type = ? ORDER BY id",
-                (event_type.name,)
-            )
-        else:
-            self._cursor.execute("SELECT id, event_type, timestamp, data FROM events ORDER BY id")
-        rows = self._cursor.fetchall()
-        keys = 'id,event_type,timestamp,data'.split(',')
-        events = []
+        self._check_open()
+        self._queue.put((event_type.name, to_microseconds(timestamp), dumps(data)))
+
+    def _record_event(self, event_type: EventType, data: Dict[str, Any]) -> None:
+        """
+        Record an event with the current timestamp.
+        Same as record_event(event_type, data, datetime.now()), without building the datetime.
+        """
+        self._check_open()
+        self._queue.put((event_type.name, now_microseconds(), dumps(data)))
+
+    def record_events(self, events: Iterable[Tuple[EventType, Dict[str, Any], datetime]]) -> None:
+        """
+        Write several events at once, bypassing the writer thread.
+        The events are sent as one JSON array and inserted by a single statement.
+        Events already queued are written first so the order is kept.
+        """
+        batch = [{'t': event_type.name, 'ts': to_microseconds(timestamp), 'd': data}
+                 for event_type, data, timestamp in events]
+        self.flush()
+        if batch:
+            with self._cursor() as cursor:
+                cursor.execute(BULK_INSERT_SQL, (dumps(batch),))
+
+    def flush(self) -> None:
+        """
+        Wait until every event queued so far has been written to the database.
+        Raises the error that made the writer give up on a batch, if there was one.
+        Every read goes through here first, so reading from a closed archivist raises too.
+        """
+        self._check_open()
+        if self._write_thread.is_alive():
+            written = threading.Event()
+            self._queue.put(written)
+            written.wait()
+        self._raise_write_error()
+
+    def _raise_write_error(self) -> None:
+        error, self._write_error = self._write_error, None
+        if error is not None:
+            raise error
+
+    def _write_events(self) -> None:
+        """
+        Write queued events to the database in batches.
+        A batch is written when it is full, when the queue is empty, or when a flush marker arrives.
+        This method runs in a background thread until it takes the _STOP sentinel.
+        """
+        rows: List[Tuple[str, int, str]] = []
+        while True:
+            try:
+                # Only block when there is nothing waiting to be written
+                item = self._queue.get(block=not rows)
+            except Empty:
+                item = None
+            if isinstance(item, tuple):
+                rows.append(item)
+                if len(rows) < self._batch_size:
+                    continue
+            if rows:
+                self._write(rows)
+                rows = []
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is _STOP:
+                return
+
+    def _write(self, rows: List[Tuple[str, int, str]]) -> None:
+        """
+        Insert rows, retrying a failed request after a growing delay.
+        If every attempt fails, the rows that are left are dropped and the error is kept for flush to raise.
+        """
+        delay = WRITE_RETRY_DELAY
+        for attempt in range(1, WRITE_ATTEMPTS + 1):
+            try:
+                self._insert(rows)
+                return
+            except Exception as e:
+                if attempt == WRITE_ATTEMPTS:
+                    print(f"Error writing {len(rows)} events, giving up: {e}")
+                    self._write_error = e
+                    return
+                time.sleep(delay)
+                delay *= 2
+
+    def _insert(self, rows: List[Tuple[str, int, str]]) -> None:
+        with self._cursor() as cursor:
+            while rows:
+                chunk = rows[:MAX_ROWS_PER_INSERT]
+                cursor.execute(
+                    insert_sql(len(chunk)),
+                    [value for row in chunk for value in row]
+                )
+                # Only drop rows once written, so a retry does not insert them twice
+                del rows[:len(chunk)]
+
+    def get_events(self, event_type=None, since_id: int = 0) -> List[dict]:
+        return list(self.iter_events(event_type, since_id))
+
+    def iter_events(self, event_type=None, since_id: int = 0) -> Iterator[dict]:
+        """
+        Yield events one at a time, decoding each only when it is reached.
+        Only events with an id greater than since_id are read, so a caller that keeps
+        the last id it has seen reads just the new events.
+        rqlite returns the whole result in one response, so the raw rows are
+        fetched up front and the pooled connection is released before the first yield.
+        """
+        self.flush()
+        with self._cursor() as cursor:
+            if event_type:
+                cursor.execute(SELECT_EVENTS_BY_TYPE_SQL, (event_type.name, since_id))
+            else:
+                cursor.execute(SELECT_EVENTS_SQL, (since_id,))
+            rows = cursor.fetchall()
         for row in rows:
-            event = {}
-            for (index, key) in enumerate(keys):
-                event[key] = row[index]
-            event['data'] = json.loads(event['data'])
-            events.append(event)
-        return events
+            yield {'id': row[0], 'event_type': row[1], 'timestamp': format_timestamp(row[2]), 'data': loads(row[3])}
+
+    def count_events(self, event_type=None) -> int:
+        """
+        Count the stored events, optionally of one type, without fetching or decoding them.
+        The count by type is answered from the (event_type, id) index.
+        """
+        self.flush()
+        with self._cursor() as cursor:
+            if event_type:
+                cursor.execute(COUNT_EVENTS_BY_TYPE_SQL, (event_type.name,))
+            else:
+                cursor.execute(COUNT_EVENTS_SQL)
+            return cursor.fetchone()[0]
 
     def clear_tables(self) -> None:
-        self._cursor.execute('DELETE FROM events')
-        self._connection.commit()
+        self.flush()
+        with self._cursor() as cursor:
+            cursor.execute('DELETE FROM events')
+            cursor.connection.commit()
 
     def close(self) -> None:
-            self._cursor.close()
-            self._connection.close()
-
+            # Later calls raise instead of waiting on the emptied pool or queueing events nobody writes
+            self._closed = True
+            atexit.unregister(self.flush)
+            self._queue.put(_STOP)
+            self._write_thread.join()
+            while not self._pool.empty():
+                self._pool.get_nowait().connection.close()
+            self._raise_write_error()
@@ -1,19 +1,36 @@
+import codecs
+import re
+from collections import deque
 from typing import Optional, List
-from queue import Queue, Empty
 from fonny.ports.communication_port import CommunicationPort
 from fonny.ports.archivist_port import ArchivistPort
 from fonny.adapters.null_adapter import NullCommunicationAdapter
 from fonny.ports.character_handler_port import CharacterHandlerPort
 
+# ASCII control characters other than newline and carriage return; one set lookup per character
+HIDDEN_CHAR_SET = frozenset(chr(code) for code in range(32) if chr(code) not in '\n\r')
+
 def is_ok(char):
     # skip ascii colour control chars
-    return char in "\n\r" or ord(char) > 31
+    return char not in HIDDEN_CHAR_SET
+
+LINE_END = re.compile('[\n\r]')
+# The characters is_ok rejects, so whole chunks can be filtered by the re engine
+HIDDEN_CHARS = re.compile('[' + re.escape(''.join(sorted(HIDDEN_CHAR_SET))) + ']')
 
 class ForthRepl(CharacterHandlerPort):
     """
     Core REPL (Read-Eval-Print Loop) for interacting with a FORTH system.
     This class uses a CommunicationPort to send commands and receive responses.
+
+    Received characters are appended to character_queue, a deque, for display;
+    control characters that is_ok rejects are left out, so consumers need not filter.
+    It expects one producer (the thread calling the handle_* methods) and one
+    consumer taking items with popleft(); deque's append and popleft are atomic,
+    so no lock is needed between them.
     """
+    __slots__ = ('_comm_port', '_archivists', '_response_recorders', '_response_chars',
+                 'character_queue', '_decoder', '_connected')
     
     def __init__(self, *archivists):
         """
@@ -24,26 +41,59 @@ class ForthRepl(CharacterHandlerPort):
         """
         self._comm_port = NullCommunicationAdapter()
         self._archivists = archivists
-        self._current_response = ""
-        self.character_queue = Queue()
+        # Bound once, since a response is recorded for every line received
+        self._response_recorders = tuple(archivist.record_system_response for archivist in archivists)
+        self._response_chars: List[str] = []
+        self.character_queue = deque()
+        # Keeps partial UTF-8 sequences that are split across reads
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        # Set by start() and cleared by stop(), so callers don't have to ask the port each time
+        self._connected = False
     
     def set_communication_port(self, communication_port: CommunicationPort) -> None:
         self._comm_port = communication_port
     
     def handle_character(self, char: str) -> None:
-        if is_ok(char):
-            self.character_queue.put(char)
+        # Called for every character received, so is_ok is inlined and attributes are looked up once
+        response_chars = self._response_chars
         # If we have a complete line (newline or carriage return), process it
-        if char == '\n' or char == '\r':
-            if self._current_response:  # Only process if we have content
-                self._process_response(self._current_response)
-                self._current_response = ""
+        if char in '\r\n':  # one C-level scan rather than two comparisons
+            self.character_queue.append(char)
+            if response_chars:  # Only process if we have content
+                self._process_response(''.join(response_chars))
+                response_chars.clear()
         else:
-            self._current_response += char
+            if char not in HIDDEN_CHAR_SET:  # skip ascii colour control chars
+                self.character_queue.append(char)
+            response_chars.append(char)
+    
+    def handle_characters(self, text: str) -> None:
+        """
+        Handle a chunk of characters in one pass.
+        The displayable characters are queued as a single item and each completed line is processed.
+        """
+        shown = HIDDEN_CHARS.sub('', text)
+        if shown:
+            self.character_queue.append(shown)
+        *lines, rest = LINE_END.split(text)
+        for line in lines:
+            if self._response_chars:  # Complete the line started by an earlier chunk
+                self._response_chars.append(line)
+                line = ''.join(self._response_chars)
+                self._response_chars.clear()
+            if line:  # Only process if we have content
+                self._process_response(line)
+        if rest:
+            self._response_chars.append(rest)
+    
+    def handle_bytes(self, data: bytes) -> None:
+        self.handle_characters(self._decoder.decode(data))
     
     def start(self) -> bool:
+        self._decoder.reset()
         try:
             success = self._comm_port.connect()
+            self._connected = success
             if success:
                 for archivist in self._archivists:
                     archivist.record_connection_opened()
@@ -54,13 +104,24 @@ class ForthRepl(CharacterHandlerPort):
             return False
     
     def stop(self) -> None:
-        if self._comm_port.is_connected():
+        if self._connected:
+            self._connected = False
             for archivist in self._archivists:
                 archivist.record_connection_closed()
             self._comm_port.disconnect()
     
+    def is_connected(self) -> bool:
+        """
+        Check whether the REPL has been started and not yet stopped.
+        
+        Returns:
+            bool: True if connected, False otherwise
+        """
+        return self._connected
+    
     def process_command(self, command: str) -> None:
-        if command.lower() == 'exit':
+        # Only lower-case commands that could be 'exit', rather than every command
+        if len(command) == 4 and command.lower() == 'exit':
             return
         
         for archivist in self._archivists:
@@ -75,5 +136,5 @@ class ForthRepl(CharacterHandlerPort):
             raise
     
     def _process_response(self, response: str) -> None:
-        for archivist in self._archivists:
-            archivist.record_system_response(response)
+        for record_response in self._response_recorders:
+            record_response(response)
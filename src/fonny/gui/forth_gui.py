@@ -1,14 +1,22 @@
+import re
+
 from guizero import App, Text, TextBox, PushButton, Box, TitleBox
 
 from fonny.adapters.serial_adapter import SerialAdapter
 from fonny.adapters.rqlite_archivist import RQLiteArchivist
 from fonny.core.repl import ForthRepl
-from queue import Empty
 
 
-def is_ok(char):
-    # skip ascii colour control chars
-    return char in "\n\r" or ord(char) > 31
+# Matches the empty string just after a line end, for splitting text into lines that keep their ends
+AFTER_LINE_END = re.compile('(?<=[\n\r])')
+
+# Oldest lines are deleted beyond this, so a long session doesn't keep slowing the widget down
+MAX_OUTPUT_LINES = 5000
+
+# Poll the character queue every POLL_INTERVAL_BUSY ms while characters are arriving,
+# backing off towards POLL_INTERVAL_IDLE ms once they stop
+POLL_INTERVAL_BUSY = 10
+POLL_INTERVAL_IDLE = 100
 
 
 class ForthGui(App):
@@ -30,6 +38,7 @@ class ForthGui(App):
         """
         super().__init__(title=title, width=width, height=height, **kwargs)
         self._repl = repl
+        self._max_lines = MAX_OUTPUT_LINES
 
         # # Create a console archivist to capture responses
         # self._console_archivist = self._create_console_archivist()
@@ -41,38 +50,51 @@ class ForthGui(App):
         # Set up event handler for when the app is closed
         self.when_closed = self.cleanup
 
-        # Set up a repeating task to process the character queue
-        self.repeat(50, self._process_character_queue)  # Check every 50ms
-
         # Buffer for accumulating characters
         self._char_buffer = ""
 
-    def _process_character_queue(self):
+        # Start polling the character queue; each poll schedules the next one
+        self._poll_interval = POLL_INTERVAL_BUSY
+        self.after(self._poll_interval, self._poll_character_queue)
+
+    def _poll_character_queue(self):
+        """Process the character queue, then schedule the next poll at an interval suited to the traffic."""
+        busy = False
+        try:
+            busy = self._process_character_queue()
+        finally:
+            if busy:
+                self._poll_interval = POLL_INTERVAL_BUSY
+            else:
+                self._poll_interval = min(int(self._poll_interval * 1.5), POLL_INTERVAL_IDLE)
+            self.after(self._poll_interval, self._poll_character_queue)
+
+    def _process_character_queue(self) -> bool:
         """
         Process characters from the queue on the main thread.
         This avoids threading issues when updating the GUI.
+
+        Returns:
+            bool: True if there were characters to process
         """
 
-        # Process all available characters in the queue
-        while self._repl.character_queue.qsize() > 0:
-            try:
-                char = self._repl.character_queue.get_nowait()
-                if is_ok(char):
-                # Add the character to our buffer
-                    self._char_buffer += char
-                    self.update()
-                # If we have a newline or carriage return, update the display
-                if char == '\n' or char == '\r':
-                    if self._char_buffer.strip():  # Only append non-empty lines
-                        # Use the same approach as append_to_output
-                        self._output.value += self._char_buffer
-                        # Scroll to the bottom
-                        self._output.tk.see("end")
-                    self._char_buffer = ""  # Reset the buffer
-
-                self._repl.character_queue.task_done()
-            except Empty:
-                break  # No more items in queue
+        character_queue = self._repl.character_queue
+        if not character_queue:
+            return False
+
+        # Take everything queued so far in one go; each item holds one or more characters.
+        # The count is fixed up front so a busy reader thread can't keep this loop running.
+        text = ''.join([character_queue.popleft() for _ in range(len(character_queue))])
+
+        # Split after each newline or carriage return, so every completed line keeps its
+        # terminator and the last part is the unfinished line. The display is updated once.
+        *lines, self._char_buffer = AFTER_LINE_END.split(self._char_buffer + text)
+        completed = [line for line in lines if line.strip()]  # Only append non-empty lines
+
+        if completed:
+            # Each line starts on a new line, as it did when lines were appended through value
+            self._append_output(''.join(['\n' + line for line in completed]))
+        return True
 
     def _create_gui_components(self):
         """Create the GUI components."""
@@ -100,6 +122,8 @@ class ForthGui(App):
         )
         self._output.bg = "black"
         self._output.text_color = "white"
+        # Written to by _append_output
+        self._output_tk = self._output.tk
 
         # Command input
         input_box = TitleBox(self, text="Command")
@@ -123,7 +147,7 @@ class ForthGui(App):
 
     def _toggle_connection(self):
         """Toggle the _connection to the FORTH system."""
-        if self._repl._comm_port.is_connected():
+        if self._repl.is_connected():
             self._repl.stop()
             self._connect_button.text = "Connect"
             self.append_to_output("Disconnected from FORTH system")
@@ -144,7 +168,7 @@ class ForthGui(App):
             return
 
         # Check if we're connected first
-        if not self._repl._comm_port.is_connected():
+        if not self._repl.is_connected():
             self.append_to_output("Error: Not connected to FORTH system. Please connect first.")
             return
 
@@ -163,16 +187,32 @@ class ForthGui(App):
 
     def append_to_output(self, text):
         """Append text to the output display."""
-        self._output.value += text + "\n"
+        self._append_output("\n" + text + "\n")
+
+    def _append_output(self, text):
+        """
+        Add text to the end of the output display, the only way output is written.
+        The Tk widget is used directly; self._output.value would read and rewrite all of the text.
+        """
+        self._output_tk.insert("end", text)
+        self._trim_output()
         # Scroll to the bottom
-        self._output.tk.see("end")
+        self._output_tk.see("end")
+
+    def _trim_output(self):
+        """Delete the oldest lines once the output holds more than _max_lines."""
+        lines = int(self._output_tk.index("end-1c").split(".")[0])
+        if lines > self._max_lines:
+            self._output_tk.delete("1.0", f"{lines - self._max_lines + 1}.0")
 
     def clear_output(self):
-        self._output.value = ""
+        self._output_tk.delete("1.0", "end")
+        # Drop any unfinished line too, so it doesn't reappear after the clear
+        self._char_buffer = ""
 
     def cleanup(self):
         """Clean up resources when the application is closed."""
-        if self._repl._comm_port.is_connected():
+        if self._repl.is_connected():
             self._repl.stop()
         self.destroy()  # Properly close the application window
 
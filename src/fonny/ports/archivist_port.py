@@ -1,7 +1,7 @@
 from abc import ABC, abstractmethod
 from datetime import datetime
 from enum import Enum, auto
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, Tuple
 
 
 class EventType(Enum):
@@ -18,6 +18,8 @@ class ArchivistPort(ABC):
     Port interface for archiving events in the FORTH REPL system.
     Implementations of this interface can store events in different backends.
     """
+    # Empty, so that archivists which declare __slots__ really have no instance __dict__
+    __slots__ = ()
     
     @abstractmethod
     def record_event(self, event_type: EventType, data: Dict[str, Any], timestamp: datetime) -> None:
@@ -30,6 +32,17 @@ class ArchivistPort(ABC):
             timestamp: Timestamp for the event
         """
         pass
+
+    def record_events(self, events: Iterable[Tuple[EventType, Dict[str, Any], datetime]]) -> None:
+        """
+        Record several events at once, for example when replaying or importing a log.
+        Implementations that can store events in bulk should override this.
+        
+        Args:
+            events: (event_type, data, timestamp) tuples, in order
+        """
+        for event_type, data, timestamp in events:
+            self.record_event(event_type, data, timestamp)
     
     def _record_event(self, event_type: EventType, data: Dict[str, Any]) -> None:
         """
@@ -6,6 +6,8 @@ class CharacterHandlerPort(ABC):
     Abstract class for handling characters received from a communication port.
     This allows for real-time processing of characters as they arrive.
     """
+    # Empty, so that handlers which declare __slots__ really have no instance __dict__
+    __slots__ = ()
     
     @abstractmethod
     def handle_character(self, char: str) -> None:
@@ -16,3 +18,23 @@ class CharacterHandlerPort(ABC):
             char: The character received
         """
         pass
+
+    def handle_characters(self, text: str) -> None:
+        """
+        Handle a run of characters received together from the communication port.
+        
+        Args:
+            text: The characters received, in order
+        """
+        for char in text:
+            self.handle_character(char)
+
+    def handle_bytes(self, data: bytes) -> None:
+        """
+        Handle raw bytes received from the communication port.
+        Handlers that can work on bytes directly may override this to skip decoding.
+        
+        Args:
+            data: The bytes received, in order
+        """
+        self.handle_characters(data.decode('utf-8', errors='replace'))
@@ -15,9 +15,7 @@ The tests use the helper functions in tests/helpers/tk_testing.py to interact
 with the guizero components.
 """
 import os
-import time
 import unittest
-from time import sleep
 
 import pytest
 from hamcrest import assert_that
@@ -27,7 +25,7 @@ from fonny.gui.forth_gui import ForthGui
 from fonny.core.repl import ForthRepl
 from fonny.adapters.serial_adapter import SerialAdapter
 from fonny.ports.archivist_port import EventType
-from helpers.waiter import wait_until
+from tests.helpers.waiter import wait_until
 from tests.helpers.tk_testing import push, type_in
 
 
@@ -36,14 +34,13 @@ class TestForthGui(unittest.TestCase):
     
     @classmethod
     def setUpClass(cls):
-        # Create a test database path
-
         cls.archivist = RQLiteArchivist(port=4003)
         cls.repl = ForthRepl(cls.archivist)
         cls.serial_adapter = SerialAdapter(character_handler=cls.repl)
         cls.repl.set_communication_port(cls.serial_adapter)
         cls.gui = ForthGui(cls.repl, title="Fonny Test")
-        cls.gui.update()
+        # Only layout and redraws need to settle here, not the whole event queue
+        cls.gui.tk.update_idletasks()
 
     @classmethod
     def tearDownClass(cls):
@@ -54,58 +51,68 @@ class TestForthGui(unittest.TestCase):
     def setUp(self):
         self.archivist.clear_tables()
         self.gui.clear_output()
-        self.gui.update()
+        self.gui.tk.update_idletasks()
 
     def tearDown(self):
         pass
 
+    def _output_since(self, start: str) -> str:
+        """Return the output text after the Tk index start, without reading the whole widget."""
+        return self.gui._output_tk.get(start, "end")
+
 
     def test_connect_and_send_command(self):
         push(self.gui._connect_button)
-        self.gui.update()
-        self.assertTrue(self.repl._comm_port.is_connected(), "Failed to connect to Pico")
-        connection_events = self.archivist.get_events(EventType.CONNECTION_OPENED)
-        self.assertGreaterEqual(len(connection_events), 1, "Connection opened event not recorded")
+
+        def check_connected():
+            self.gui.update()
+            return self.repl.is_connected()
+
+        self.assertTrue(wait_until(check_connected, timeout=2.0, delay=0.02), "Failed to connect to Pico")
+        self.assertGreaterEqual(self.archivist.count_events(EventType.CONNECTION_OPENED), 1,
+                                "Connection opened event not recorded")
         test_command = "2 2 + ."
-        type_in(self.gui._command_input, test_command)
+        type_in(self.gui._command_input, test_command, trigger_command=False)
+        # Only the output added after this point needs to be searched
+        start = self.gui._output_tk.index("end-1c")
         push(self.gui._send_button)
 
         def check_output_value(text: str):
-            # print(text)
             self.gui.update()
-            value = self.gui._output.value
+            value = self._output_since(start)
             return text in value
 
-        self.assertTrue(wait_until(check_output_value, text='4'), f"4 not in gui output")
-        self.assertIn("ok", self.gui._output.value, "Expected 'ok' in response")
+        self.assertTrue(wait_until(check_output_value, timeout=2.0, delay=0.02, text='4'), f"4 not in gui output")
+        self.assertIn("ok", self._output_since(start), "Expected 'ok' in response")
         command_events = self.archivist.get_events(EventType.USER_COMMAND)
         self.assertGreaterEqual(len(command_events), 1, "User command event not recorded")
         latest_command = command_events[-1]
         expected_command = test_command + "\n"
         self.assertEqual(latest_command['data']['command'], expected_command,
                          f"Expected command '{expected_command}' but got '{latest_command['data']['command']}'")
-        response_events = self.archivist.get_events(EventType.SYSTEM_RESPONSE)
-        self.assertGreaterEqual(len(response_events), 1, "System response event not recorded")
+        self.assertGreaterEqual(self.archivist.count_events(EventType.SYSTEM_RESPONSE), 1,
+                                "System response event not recorded")
 
     def test_error_handling(self):
         """Test that errors are properly displayed."""
         # Connect if not already connected
-        if not self.repl._comm_port.is_connected():
+        if not self.repl.is_connected():
             push(self.gui._connect_button)
 
         self.serial_adapter.clear_buffer()
         self.gui.clear_output()
         # Send an invalid command
         invalid_command = "invalid_command"
-        type_in(self.gui._command_input, invalid_command)
+        type_in(self.gui._command_input, invalid_command, trigger_command=False)
+        start = self.gui._output_tk.index("end-1c")
         push(self.gui._send_button)
         # Verify that an error message is displayed
         def find_unable_to_parse():
             self.gui.update()
-            output_text = self.gui._output.value
+            output_text = self._output_since(start)
             return "unable to parse" in output_text
 
-        assert_that(wait_until(find_unable_to_parse),
+        assert_that(wait_until(find_unable_to_parse, timeout=2.0, delay=0.02),
                     "unable to find 'unable to parse' in output")
         command_events = self.archivist.get_events(EventType.USER_COMMAND)
         self.assertGreaterEqual(len(command_events), 1, "User command event not recorded")
@@ -1,38 +1,48 @@
-import json
+import atexit
 import sqlite3
+import threading
 
+from fonny.adapters.rqlite_archivist import loads, format_timestamp, SELECT_EVENTS_SQL, SELECT_EVENTS_BY_TYPE_SQL
 
-def get_events_from_db(test_db_path, event_type=None) -> dict:
-    # fresh connection to avoid threading problems
-    sqlite3.threadsafety = 3
-    conn = sqlite3.connect(test_db_path)
-    conn.row_factory = sqlite3.Row  # This enables column access by name
-    cursor = conn.cursor()
+# One connection per database per thread, so connections are reused without being shared between threads
+_local = threading.local()
+# Every connection opened, from any thread, so they can all be closed at exit
+_opened = []
+
+
+@atexit.register
+def _close_connections():
+    for conn in _opened:
+        conn.close()
+
+
+def _connection(test_db_path) -> sqlite3.Connection:
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    conn = connections.get(test_db_path)
+    if conn is None:
+        # Only used by this thread; check_same_thread=False lets _close_connections close it at exit
+        conn = connections[test_db_path] = sqlite3.connect(test_db_path, check_same_thread=False)
+        _opened.append(conn)
+    return conn
+
+
+def get_events_from_db(test_db_path, event_type=None, since_id=0) -> dict:
+    conn = _connection(test_db_path)
     if event_type:
-        cursor.execute(
-            "SELECT id, event_type, timestamp, data FROM events WHERE event_type = ? ORDER BY id",
-            (event_type.name,)
-        )
+        rows = conn.execute(SELECT_EVENTS_BY_TYPE_SQL, (event_type.name, since_id)).fetchall()
     else:
-        cursor.execute("SELECT id, event_type, timestamp, data FROM events ORDER BY id")
-
-    rows = cursor.fetchall()
-    conn.close()
-    events = []
-    for row in rows:
-        event = dict(row)
-        event['data'] = json.loads(event['data'])
-        events.append(event)
-    return events
+        rows = conn.execute(SELECT_EVENTS_SQL, (since_id,)).fetchall()
+    # Plain tuples in SELECT order; building each dict directly avoids sqlite3.Row and dict(row)
+    return [
+        {'id': row[0], 'event_type': row[1], 'timestamp': format_timestamp(row[2]), 'data': loads(row[3])}
+        for row in rows
+    ]
 
 def clear_events_table(test_db_path):
-    sqlite3.threadsafety = 3
-    # fresh connection to avoid threading problems
-    conn = sqlite3.connect(test_db_path)
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM events")
+    conn = _connection(test_db_path)
+    conn.execute("DELETE FROM events")
     conn.commit()
-    cursor.close()
-    conn.close()
 
 
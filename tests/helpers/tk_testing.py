@@ -22,7 +22,7 @@ def push(button: PushButton) -> None:
     button.tk.invoke()
 
 
-def type_in(text_box: TextBox, text: str, position=None):
+def type_in(text_box: TextBox, text: str, position=None, flush=False, trigger_command=True):
     """
     Type text into a TextBox in a guizero application.
     
@@ -30,12 +30,19 @@ def type_in(text_box: TextBox, text: str, position=None):
         text_box: The TextBox to type into
         text: The text to type
         position: The position to insert the text (default: end)
+        flush: If True, process all pending Tk events afterwards with update();
+            by default only idle tasks such as redraws are run
+        trigger_command: If False, don't call the TextBox's command; use this when the
+            text is only being filled in, for example before pressing a button that reads it
     """
     position = position or "end"
     text_box.tk.insert(position, text)
-    if hasattr(text_box, "_command") and callable(text_box._command):
+    if trigger_command and hasattr(text_box, "_command") and callable(text_box._command):
         text_box._command()
-    text_box.tk.update()
+    if flush:
+        text_box.tk.update()
+    else:
+        text_box.tk.update_idletasks()
 
 
 def shift_return(text_box: TextBox) -> None:
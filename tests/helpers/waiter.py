@@ -8,15 +8,21 @@ def wait_until(condition: callable, timeout=0.5, delay=0.1, **args) -> bool:
         Args:
             condition (callable): A callable function that returns a boolean value.
             timeout (float, optional): The maximum duration (in seconds) to wait for the condition to become `True`. Defaults to 0.5 seconds.
-            delay (float, optional): The interval (in seconds) between successive evaluations of the condition. Defaults to 0.1 seconds.
+            delay (float, optional): The longest interval (in seconds) between successive evaluations of the condition. Defaults to 0.1 seconds.
+                Polling starts at 1 ms and doubles up to this, so fast conditions are seen early.
             **args: Additional keyword arguments to pass to the condition function.
 
         Returns:
             bool: `True` if the condition becomes `True` within the timeout duration, otherwise `False`.
     """
-    time_end = time.time() + timeout
-    while time.time() < time_end:
+    time_end = time.monotonic() + timeout
+    pause = min(0.001, delay)
+    while True:
         if condition(**args):
             return True
-        time.sleep(delay)
-    return False
\ No newline at end of file
+        remaining = time_end - time.monotonic()
+        if remaining <= 0:
+            return False
+        # Never sleep past the deadline, and check once more when it is reached
+        time.sleep(min(pause, remaining))
+        pause = min(pause * 2, delay)
\ No newline at end of file
@@ -1,10 +1,11 @@
+import threading
+
 import pytest
 
 from hamcrest import assert_that
 
 from fonny.adapters.serial_adapter import SerialAdapter
 from fonny.ports.character_handler_port import CharacterHandlerPort
-from helpers.waiter import wait_until
 
 
 class MockCharacterHandler(CharacterHandlerPort):
@@ -15,39 +16,58 @@ class MockCharacterHandler(CharacterHandlerPort):
 
     def __init__(self):
         self.received_chars = []
-        self.response_complete = False
+        # Set by the reading thread as soon as "ok" arrives, so tests can wait on it
+        self.response_complete = threading.Event()
 
     def handle_character(self, char_received: str) -> None:
+        # Check if the response is complete (contains "ok"); only the newest pair
+        # can be new, so there is no need to join and search everything received
+        if char_received == "k" and self.received_chars and self.received_chars[-1][-1:] == "o":
+            self.response_complete.set()
         self.received_chars.append(char_received)
 
-        # Check if the response is complete (contains "ok")
-        received_text = ''.join(self.received_chars)
-        if "ok" in received_text:
-            self.response_complete = True
+    def handle_characters(self, text: str) -> None:
+        # SerialAdapter hands over everything read at once; keep it as one chunk.
+        # "ok" may straddle the previous chunk, so check with its last character
+        previous = self.received_chars[-1][-1:] if self.received_chars else ''
+        self.received_chars.append(text)
+        if "ok" in previous + text:
+            self.response_complete.set()
 
     def get_received_text(self) -> str:
         return ''.join(self.received_chars)
 
+    def clear(self) -> None:
+        self.received_chars = []
+        self.response_complete.clear()
+
+
+@pytest.fixture(scope="module")
+def connected_adapter():
+    """Open the Pico's serial port once for every test in this module."""
+    char_handler = MockCharacterHandler()
+    adapter = SerialAdapter(character_handler=char_handler)
+    if not adapter.connect():
+        pytest.skip("Could not connect to the Pico. Test skipped.")
+    yield adapter, char_handler
+    adapter.disconnect()
+
+
+@pytest.fixture
+def pico(connected_adapter):
+    """The shared connection, with nothing left over from earlier tests."""
+    adapter, char_handler = connected_adapter
+    adapter.clear_buffer()
+    char_handler.clear()
+    return adapter, char_handler
+
 
 class TestSerialAdapterIntegration:
     """Integration tests for the SerialAdapter class."""
     
-    def test_character_by_character_reading(self):
-        char_handler = MockCharacterHandler()
-        adapter = SerialAdapter(character_handler=char_handler)
-        connected = adapter.connect()
-        if not connected:
-            pytest.skip("Could not connect to the Pico. Test skipped.")
-        try:
-            adapter.clear_buffer()
-            test_command = "words\n"
-            adapter.send_command(test_command)
-            
-            def find_ok():
-                received_text = char_handler.get_received_text()
-                return 'ok' in received_text
-
-            assert_that(wait_until(find_ok), 'response should end with ok')
-        finally:
-            # Clean up
-            adapter.clear_buffer()
+    def test_character_by_character_reading(self, pico):
+        adapter, char_handler = pico
+        test_command = "words\n"
+        adapter.send_command(test_command)
+
+        assert_that(char_handler.response_complete.wait(timeout=2.0), 'response should end with ok')
@@ -95,3 +95,19 @@ class TestArchivistPort:
         assert event_type == EventType.CONNECTION_CLOSED
         assert data == {}
         assert isinstance(timestamp, datetime)
+
+    def test_record_events_calls_record_event_for_each_event(self):
+        """Test that record_events passes each event to record_event in order."""
+        # Arrange
+        archivist = MockArchivist()
+        timestamp = datetime.now()
+        events = [
+            (EventType.USER_COMMAND, {"command": "words"}, timestamp),
+            (EventType.SYSTEM_RESPONSE, {"response": "ok"}, timestamp),
+        ]
+
+        # Act
+        archivist.record_events(events)
+
+        # Assert
+        assert archivist.events == events
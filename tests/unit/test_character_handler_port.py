@@ -0,0 +1,40 @@
+from typing import List
+
+from fonny.ports.character_handler_port import CharacterHandlerPort
+
+
+class MockCharacterHandler(CharacterHandlerPort):
+    """Mock implementation of CharacterHandlerPort for testing."""
+
+    def __init__(self):
+        self.received_chars: List[str] = []
+
+    def handle_character(self, char: str) -> None:
+        """Handle a character by storing it in a list."""
+        self.received_chars.append(char)
+
+
+class TestCharacterHandlerPort:
+    """Tests for the CharacterHandlerPort interface."""
+
+    def test_handle_characters_calls_handle_character_for_each_character(self):
+        """Test that handle_characters passes each character on in order."""
+        # Arrange
+        handler = MockCharacterHandler()
+
+        # Act
+        handler.handle_characters("ok\n")
+
+        # Assert
+        assert handler.received_chars == ["o", "k", "\n"]
+
+    def test_handle_bytes_decodes_and_passes_on_each_character(self):
+        """Test that handle_bytes decodes UTF-8 and passes each character on in order."""
+        # Arrange
+        handler = MockCharacterHandler()
+
+        # Act
+        handler.handle_bytes("é ok".encode('utf-8'))
+
+        # Assert
+        assert handler.received_chars == ["é", " ", "o", "k"]
@@ -6,7 +6,7 @@ from typing import List, Optional
 from fonny.ports.communication_port import CommunicationPort
 from fonny.ports.character_handler_port import CharacterHandlerPort
 from fonny.ports.archivist_port import ArchivistPort, EventType
-from fonny.core.repl import ForthRepl
+from fonny.core.repl import ForthRepl, is_ok
 from datetime import datetime
 
 
@@ -20,12 +20,12 @@ class MockCommunicationPort(CommunicationPort):
         Initialize the mock with optional predefined responses.
         
         Args:
-            responses: List of responses to return when receive_response is called
+            responses: List of responses the device would send back. This mock has
+                no character handler, so they are only stored, never delivered.
         """
         self.connected = False
         self.commands = []
         self.responses = responses or []
-        self.response_index = 0
     
     def connect(self) -> bool:
         """Mock implementation of connect."""
@@ -42,18 +42,6 @@ class MockCommunicationPort(CommunicationPort):
             raise ConnectionError("Not connected")
         self.commands.append(command)
     
-    def receive_response(self) -> str:
-        """Mock implementation of receive_response."""
-        if not self.connected:
-            raise ConnectionError("Not connected")
-        
-        if self.response_index < len(self.responses):
-            response = self.responses[self.response_index]
-            self.response_index += 1
-            return response
-        
-        return None
-    
     def is_connected(self) -> bool:
         """Mock implementation of is_connected."""
         return self.connected
@@ -89,12 +77,6 @@ class MockCommunicationPortWithError(CommunicationPort):
             raise ConnectionError("Not connected")
         self.commands.append(command)
     
-    def receive_response(self) -> str:
-        """Mock implementation of receive_response."""
-        if not self.connected:
-            raise ConnectionError("Not connected")
-        return None
-    
     def is_connected(self) -> bool:
         """Mock implementation of is_connected."""
         return self.connected
@@ -139,12 +121,13 @@ class MockCommunicationPortWithCharacterHandler(CommunicationPort):
         
         Args:
             character_handler: Handler for processing characters as they arrive
-            responses: List of responses to return when receive_response is called
+            responses: List of responses, one fed to the character handler, a character
+                at a time, for each command sent
         """
         self.connected = False
         self.commands = []
         self.responses = responses or []
-        self.response_index = 0
+        self._next_responses = iter(self.responses)
         self._character_handler = character_handler
     
     def connect(self) -> bool:
@@ -169,10 +152,8 @@ class MockCommunicationPortWithCharacterHandler(CommunicationPort):
         self.commands.append(command)
         
         # Simulate character-by-character response processing
-        if self.response_index < len(self.responses):
-            response = self.responses[self.response_index]
-            self.response_index += 1
-            
+        response = next(self._next_responses, None)
+        if response is not None:
             # Process each character in the response
             for char in response:
                 if self._character_handler:
@@ -297,6 +278,33 @@ class TestForthRepl:
         # Assert
         assert mock_port.connected is False
     
+    def test_is_connected_follows_start_and_stop(self, mock_port, repl):
+        """Test that is_connected is True only between a successful start and stop."""
+        # Arrange
+        repl.set_communication_port(mock_port)
+        
+        # Act
+        before = repl.is_connected()
+        repl.start()
+        started = repl.is_connected()
+        repl.stop()
+        
+        # Assert
+        assert before is False
+        assert started is True
+        assert repl.is_connected() is False
+    
+    def test_is_connected_is_false_after_failed_start(self, mock_port_with_error, repl):
+        """Test that a start that raises leaves the REPL disconnected."""
+        # Arrange
+        repl.set_communication_port(mock_port_with_error)
+        
+        # Act
+        repl.start()
+        
+        # Assert
+        assert repl.is_connected() is False
+    
     def test_process_command_sends_to_port(self, connected_repl, mock_port):
         """Test that process_command sends the command to the port."""
         # Act
@@ -322,6 +330,15 @@ class TestForthRepl:
         # Assert
         assert mock_port.commands == []  # No command should be sent
     
+    def test_process_command_handles_exit_command_in_any_case(self, connected_repl, mock_port):
+        """Test that process_command recognises the exit command whatever its case."""
+        # Act
+        connected_repl.process_command("Exit")
+        connected_repl.process_command("EXIT")
+        
+        # Assert
+        assert mock_port.commands == []
+    
     def test_archivists_record_responses(self, connected_repl_with_archivist, mock_archivist):
         """Test that archivists record responses."""
         # Act
@@ -413,6 +430,74 @@ class TestForthRepl:
         assert len(mock_archivist.system_responses) == 1
         assert mock_archivist.system_responses[0] == "Hello, FORTH!"
     
+    def test_handle_characters_processes_lines_split_across_chunks(self, repl_with_archivist, mock_archivist):
+        """Test that handle_characters joins a line that arrives in more than one chunk."""
+        # Act
+        repl_with_archivist.handle_characters("2 2 + . 4")
+        repl_with_archivist.handle_characters("  ok\r\nwords\r")
+        repl_with_archivist.handle_characters("\n")
+        
+        # Assert
+        assert mock_archivist.system_responses == ["2 2 + . 4  ok", "words"]
+    
+    def test_handle_characters_matches_character_by_character_handling(self):
+        """Test that chunked and character-by-character handling record the same responses."""
+        # Arrange
+        text = "\x1b[32mok\x1b[0m\r\n\r\nunable to parse\nrest"
+        
+        for split in range(len(text) + 1):
+            by_character = MockArchivist()
+            by_chunk = MockArchivist()
+            
+            # Act
+            self._send_characters(ForthRepl(by_character), text)
+            chunked_repl = ForthRepl(by_chunk)
+            chunked_repl.handle_characters(text[:split])
+            chunked_repl.handle_characters(text[split:])
+            
+            # Assert
+            assert by_chunk.system_responses == by_character.system_responses
+    
+    def test_handle_characters_queues_displayable_characters_as_one_item(self, repl):
+        """Test that handle_characters queues a chunk once, without control characters."""
+        # Act
+        repl.handle_characters("\x1b[32mok\r\n")
+        
+        # Assert
+        assert list(repl.character_queue) == ["[32mok\r\n"]
+    
+    def test_is_ok_rejects_only_control_characters_other_than_line_ends(self):
+        """Test that is_ok keeps newlines, carriage returns and every character from space upwards."""
+        # Act
+        rejected = [code for code in range(300) if not is_ok(chr(code))]
+        
+        # Assert
+        assert rejected == [code for code in range(32) if code not in (10, 13)]
+    
+    def test_handle_characters_hides_the_same_characters_as_is_ok(self, repl):
+        """Test that chunked filtering drops exactly the characters is_ok rejects."""
+        # Arrange
+        text = ''.join(chr(code) for code in range(300))
+        
+        # Act
+        repl.handle_characters(text)
+        
+        # Assert
+        assert list(repl.character_queue) == [''.join(filter(is_ok, text))]
+    
+    def test_handle_bytes_decodes_characters_split_across_reads(self, repl_with_archivist, mock_archivist):
+        """Test that handle_bytes keeps a UTF-8 character split across two reads intact."""
+        # Arrange
+        data = "café ok\n".encode('utf-8')
+        split = data.index(b'\xa9')
+        
+        # Act
+        repl_with_archivist.handle_bytes(data[:split])
+        repl_with_archivist.handle_bytes(data[split:])
+        
+        # Assert
+        assert mock_archivist.system_responses == ["café ok"]
+    
     def test_archivist_records_connection_events(self, repl_with_archivist, mock_port, mock_archivist):
         """Test that archivists record _connection events."""
         # Arrange
@@ -1,12 +1,15 @@
 import os
 
 import json
-from datetime import datetime
+import sqlite3
+from datetime import datetime, timezone
 import pytest
 from hamcrest import assert_that, equal_to
 
-from fonny.adapters.rqlite_archivist import RQLiteArchivist
+from fonny.adapters.rqlite_archivist import RQLiteArchivist, MAX_ROWS_PER_INSERT, SELECT_EVENTS_BY_TYPE_SQL, format_timestamp, \
+    EPOCH, MICROSECOND, CREATE_EVENTS_TABLE_SQL, CREATE_EVENTS_INDEX_SQL, now_microseconds
 from fonny.ports.archivist_port import EventType
+from tests.helpers.waiter import wait_until
 
 @pytest.fixture
 def archivist():
@@ -54,3 +57,180 @@ class TestRQLiteArchivist:
         assert_that(len(events), equal_to(2))
         assert_that(events[0]['event_type'], equal_to(EventType.CONNECTION_OPENED.name))
         assert_that(events[1]['event_type'], equal_to(EventType.CONNECTION_CLOSED.name))
+
+    def test_events_are_written_in_the_background(self):
+        """Test that queued events reach the database without an explicit flush."""
+        writer = RQLiteArchivist(port=4003, batch_size=2)
+        writer.clear_tables()
+        reader = RQLiteArchivist(port=4003)
+        try:
+            writer.record_user_command("first")
+            writer.record_user_command("second")
+            assert_that(wait_until(lambda: len(reader.get_events()) == 2), 'events should be written')
+        finally:
+            reader.close()
+            writer.close()
+
+    def test_close_flushes_pending_events(self):
+        """Test that events still queued are written on close."""
+        writer = RQLiteArchivist(port=4003)
+        writer.clear_tables()
+        writer.record_user_command("pending")
+        writer.close()
+        reader = RQLiteArchivist(port=4003)
+        try:
+            events = reader.get_events(EventType.USER_COMMAND)
+            assert_that(len(events), equal_to(1))
+            assert_that(events[0]['data']["command"], equal_to("pending"))
+        finally:
+            reader.close()
+
+    def test_closed_archivist_refuses_reads_and_writes(self):
+        """Test that using an archivist after close raises instead of hanging or losing events."""
+        archivist = RQLiteArchivist(port=4003)
+        archivist.close()
+        with pytest.raises(RuntimeError):
+            archivist.get_events()
+        with pytest.raises(RuntimeError):
+            archivist.record_user_command("words")
+
+    def test_pool_needs_at_least_one_connection(self):
+        """Test that an empty connection pool is rejected up front."""
+        with pytest.raises(ValueError):
+            RQLiteArchivist(port=4003, pool_size=0)
+
+    def test_flush_writes_more_events_than_fit_in_one_insert(self, archivist):
+        """Test that a batch larger than one multi-row INSERT writes every event in order."""
+        for index in range(MAX_ROWS_PER_INSERT + 1):
+            archivist.record_user_command(f"command {index}")
+        archivist.flush()
+        events = archivist.get_events()
+        assert_that(len(events), equal_to(MAX_ROWS_PER_INSERT + 1))
+        assert_that(events[-1]['data']["command"], equal_to(f"command {MAX_ROWS_PER_INSERT}"))
+
+    def test_flush_retries_a_failed_insert(self, archivist, monkeypatch):
+        """Test that events from a batch whose first insert fails are still written."""
+        monkeypatch.setattr('fonny.adapters.rqlite_archivist.WRITE_RETRY_DELAY', 0)
+        insert = RQLiteArchivist._insert
+        failures = []
+
+        def fail_once(self, rows):
+            if not failures:
+                failures.append(rows)
+                raise ConnectionError("rqlite unavailable")
+            insert(self, rows)
+
+        monkeypatch.setattr(RQLiteArchivist, '_insert', fail_once)
+        archivist.record_user_command("words")
+        archivist.flush()
+        assert_that(len(failures), equal_to(1))
+        assert_that([event['data'] for event in archivist.get_events()], equal_to([{"command": "words"}]))
+
+    def test_flush_raises_when_a_batch_cannot_be_written(self, archivist, monkeypatch):
+        """Test that flush reports a batch the writer gave up on instead of returning as if it were stored."""
+        monkeypatch.setattr('fonny.adapters.rqlite_archivist.WRITE_RETRY_DELAY', 0)
+
+        def always_fail(self, rows):
+            raise ConnectionError("rqlite unavailable")
+
+        monkeypatch.setattr(RQLiteArchivist, '_insert', always_fail)
+        archivist.record_user_command("words")
+        with pytest.raises(ConnectionError):
+            archivist.flush()
+        monkeypatch.undo()
+        assert_that(archivist.get_events(), equal_to([]))
+
+    def test_record_events_writes_events_in_order(self, archivist):
+        """Test that record_events stores every event after those already recorded."""
+        archivist.record_user_command("first")
+        timestamp = datetime.now()
+        archivist.record_events([
+            (EventType.USER_COMMAND, {"command": "second"}, timestamp),
+            (EventType.SYSTEM_RESPONSE, {"response": "ok"}, timestamp),
+        ])
+        events = archivist.get_events()
+        assert_that([event['event_type'] for event in events], equal_to([
+            EventType.USER_COMMAND.name, EventType.USER_COMMAND.name, EventType.SYSTEM_RESPONSE.name]))
+        assert_that(events[1]['data']["command"], equal_to("second"))
+        assert_that(events[2]['timestamp'], equal_to(timestamp.isoformat()))
+
+    def test_record_events_stores_data_unchanged(self, archivist):
+        """Test that record_events keeps quotes and non-ASCII text in event data intact."""
+        archivist.record_events([
+            (EventType.SYSTEM_RESPONSE, {"response": "can't parse \"café\" ?"}, datetime.now()),
+            (EventType.CONNECTION_OPENED, {}, datetime.now()),
+        ])
+        events = archivist.get_events()
+        assert_that(events[0]['data'], equal_to({"response": "can't parse \"café\" ?"}))
+        assert_that(events[1]['data'], equal_to({}))
+
+    def test_iter_events_yields_the_same_events_as_get_events(self, archivist):
+        """Test that iter_events yields events lazily, matching get_events."""
+        archivist.record_user_command("2 2 + .")
+        archivist.record_system_response("4 ok")
+        events = archivist.iter_events(EventType.SYSTEM_RESPONSE)
+        assert_that(next(events)['data'], equal_to({"response": "4 ok"}))
+        assert_that(list(events), equal_to([]))
+        assert_that(list(archivist.iter_events()), equal_to(archivist.get_events()))
+
+    def test_events_by_type_are_read_through_the_type_index(self):
+        """Test that selecting one event type searches the (event_type, id) index without a sort."""
+        # rqlite only returns rows for SELECT and PRAGMA, so the plan is checked on a local SQLite database
+        conn = sqlite3.connect(':memory:')
+        conn.execute(CREATE_EVENTS_TABLE_SQL)
+        conn.execute(CREATE_EVENTS_INDEX_SQL)
+        rows = conn.execute("EXPLAIN QUERY PLAN " + SELECT_EVENTS_BY_TYPE_SQL, (EventType.USER_COMMAND.name, 0))
+        plan = ' '.join(row[3] for row in rows)
+        conn.close()
+        assert_that('USING INDEX idx_events_type_id' in plan, 'plan should use the index: ' + plan)
+        assert_that('TEMP B-TREE' not in plan, 'plan should not sort: ' + plan)
+
+    def test_timestamps_are_returned_to_the_microsecond(self, archivist):
+        """Test that timestamps stored as integers come back as the ISO-8601 text of the original."""
+        timestamp = datetime(2024, 3, 31, 1, 59, 59, 999999)
+        archivist.record_event(EventType.USER_COMMAND, {"command": "words"}, timestamp)
+        archivist.record_events([(EventType.SYSTEM_RESPONSE, {"response": "ok"}, timestamp)])
+        events = archivist.get_events()
+        assert_that([event['timestamp'] for event in events], equal_to([timestamp.isoformat()] * 2))
+
+    def test_aware_timestamps_are_stored_as_local_time(self, archivist):
+        """Test that timezone-aware timestamps are converted to local wall-clock time rather than rejected."""
+        timestamp = datetime(2024, 3, 31, 1, 59, 59, 999999, tzinfo=timezone.utc)
+        local = timestamp.astimezone().replace(tzinfo=None)
+        archivist.record_event(EventType.USER_COMMAND, {"command": "words"}, timestamp)
+        archivist.record_events([(EventType.SYSTEM_RESPONSE, {"response": "ok"}, timestamp)])
+        events = archivist.get_events()
+        assert_that([event['timestamp'] for event in events], equal_to([local.isoformat()] * 2))
+
+    def test_format_timestamp_keeps_iso_text_written_by_older_versions(self):
+        """Test that timestamps already stored as ISO-8601 text are returned unchanged."""
+        assert_that(format_timestamp("2024-03-31T01:59:59.999999"), equal_to("2024-03-31T01:59:59.999999"))
+        assert_that(format_timestamp("1711850399999999"), equal_to("2024-03-31T01:59:59.999999"))
+
+    def test_current_time_matches_datetime_now(self):
+        """Test that events recorded with the current time get the timestamp datetime.now() would give."""
+        before = (datetime.now() - EPOCH) // MICROSECOND
+        now = now_microseconds()
+        after = (datetime.now() - EPOCH) // MICROSECOND
+        # datetime.now() rounds to the nearest microsecond, now_microseconds truncates
+        assert_that(before - 1 <= now <= after + 1, f"{before} <= {now} <= {after}")
+
+    def test_get_events_since_id_returns_only_newer_events(self, archivist):
+        """Test that since_id skips the events a caller has already read."""
+        archivist.record_user_command("first")
+        archivist.record_system_response("ok")
+        seen = archivist.get_events()
+        archivist.record_user_command("second")
+        newer = archivist.get_events(since_id=seen[-1]['id'])
+        newer_commands = archivist.get_events(EventType.USER_COMMAND, since_id=seen[-1]['id'])
+        assert_that([event['data'] for event in newer], equal_to([{"command": "second"}]))
+        assert_that(newer_commands, equal_to(newer))
+
+    def test_count_events_counts_without_fetching(self, archivist):
+        """Test that count_events matches the number of events get_events returns."""
+        archivist.record_user_command("2 2 + .")
+        archivist.record_system_response("4 ok")
+        archivist.record_system_response("ok")
+        assert_that(archivist.count_events(), equal_to(3))
+        assert_that(archivist.count_events(EventType.SYSTEM_RESPONSE), equal_to(2))
+        assert_that(archivist.count_events(EventType.SYSTEM_ERROR), equal_to(0))